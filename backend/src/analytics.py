@@ -0,0 +1,158 @@
+"""
+Relatório sobre o log de perguntas (QUERY_LOG_PATH).
+
+Uso:
+    python -m src.analytics [--days 7] [--limit 20] [--low-score 0.5] [--origin query] [--json]
+
+Mostra as perguntas mais repetidas (candidatas a pré-aquecer o cache de
+respostas), as perguntas com busca fraca ou "Não sei" (indício de documento
+faltando na base) e a latência de cada etapa do grafo. Por padrão considera só
+o tráfego interativo (/chat/query); execuções de /chat/batch ficam de fora.
+"""
+import argparse
+import json
+import sqlite3
+import time
+from typing import List, Optional
+
+from .config import Settings
+from .services.query_log import connect
+
+STAGES = ("triage_ms", "retrieval_ms", "llm_ms", "total_ms")
+ORIGINS = ("query", "batch", "all")
+
+# Janela de tempo + origem ("all" desliga o filtro de origem)
+WINDOW = "ts >= ? AND (? = 'all' OR origin = ?)"
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def top_questions(conn: sqlite3.Connection, since: float, origin: str, limit: int) -> List[dict]:
+    rows = conn.execute(
+        """
+        SELECT question_normalized, COUNT(*) AS total, SUM(cached) AS cached,
+               AVG(max_score) AS avg_max_score
+        FROM query_log
+        WHERE {WINDOW}
+        GROUP BY question_normalized
+        HAVING total > 1
+        ORDER BY total DESC
+        LIMIT ?
+        """.format(WINDOW=WINDOW),
+        (since, origin, origin, limit)
+    ).fetchall()
+    return [
+        {"question": q, "count": total, "cached": cached, "avg_max_score": score}
+        for q, total, cached, score in rows
+    ]
+
+
+def low_score_questions(conn: sqlite3.Connection, since: float, origin: str, limit: int, threshold: float) -> List[dict]:
+    rows = conn.execute(
+        """
+        SELECT question_normalized, COUNT(*) AS total, MAX(max_score) AS best_score,
+               SUM(dont_know) AS dont_know
+        FROM query_log
+        WHERE {WINDOW} AND cached = 0 AND decision = 'AUTO_RESOLVER'
+          AND (max_score IS NULL OR max_score < ? OR dont_know = 1)
+        GROUP BY question_normalized
+        ORDER BY total DESC
+        LIMIT ?
+        """.format(WINDOW=WINDOW),
+        (since, origin, origin, threshold, limit)
+    ).fetchall()
+    return [
+        {"question": q, "count": total, "best_score": score, "dont_know": dont_know}
+        for q, total, score, dont_know in rows
+    ]
+
+
+def stage_latencies(conn: sqlite3.Connection, since: float, origin: str) -> dict:
+    rows = conn.execute(
+        f"SELECT {', '.join(STAGES)} FROM query_log WHERE {WINDOW} AND cached = 0",
+        (since, origin, origin)
+    ).fetchall()
+    report = {}
+    for i, stage in enumerate(STAGES):
+        values = [row[i] for row in rows if row[i] is not None]
+        report[stage] = {
+            "count": len(values),
+            "avg": sum(values) / len(values) if values else None,
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+        }
+    return report
+
+
+def build_report(path: str, days: float, limit: int, low_score: float, origin: str = "query") -> dict:
+    since = time.time() - days * 86400
+    conn = connect(path)
+    try:
+        total, cached = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(cached), 0) FROM query_log WHERE {WINDOW}",
+            (since, origin, origin)
+        ).fetchone()
+        return {
+            "days": days,
+            "origin": origin,
+            "total_queries": total,
+            "cache_hits": cached,
+            "top_questions": top_questions(conn, since, origin, limit),
+            "low_score_questions": low_score_questions(conn, since, origin, limit, low_score),
+            "latency_ms": stage_latencies(conn, since, origin),
+        }
+    finally:
+        conn.close()
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_report(report: dict) -> None:
+    print(f"Perguntas nos últimos {report['days']:g} dias (origem: {report['origin']}): "
+          f"{report['total_queries']} ({report['cache_hits']} respondidas pelo cache)\n")
+
+    print("Perguntas mais repetidas:")
+    for item in report["top_questions"]:
+        print(f"  {item['count']:5d}x  score {_fmt(item['avg_max_score'])}  {item['question']}")
+
+    print("\nPerguntas com busca fraca ou \"Não sei\":")
+    for item in report["low_score_questions"]:
+        print(f"  {item['count']:5d}x  score {_fmt(item['best_score'])}  "
+              f"não sei {item['dont_know'] or 0}  {item['question']}")
+
+    print("\nLatência por etapa (ms, sem cache):")
+    for stage, stats in report["latency_ms"].items():
+        print(f"  {stage:13s} n={stats['count']:<6d} avg={_fmt(stats['avg'])}  "
+              f"p50={_fmt(stats['p50'])}  p95={_fmt(stats['p95'])}")
+
+
+def main() -> None:
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Relatório do log de perguntas do ITT Chatbot")
+    parser.add_argument("--path", default=settings.QUERY_LOG_PATH, help="Arquivo SQLite do log")
+    parser.add_argument("--days", type=float, default=7, help="Janela de tempo em dias")
+    parser.add_argument("--limit", type=int, default=20, help="Linhas por seção")
+    parser.add_argument("--low-score", type=float, default=0.5,
+                        help="Score máximo abaixo do qual a busca é considerada fraca")
+    parser.add_argument("--origin", choices=ORIGINS, default="query",
+                        help="query = /chat/query (padrão), batch = /chat/batch, all = ambos")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    report = build_report(args.path, args.days, args.limit, args.low_score, args.origin)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
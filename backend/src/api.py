@@ -4,45 +4,78 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 import uvicorn
 import asyncio
+import time
 from contextlib import asynccontextmanager
 
 from .routers import chat_router, admin_router
 from .dependencies import get_settings
-from .services import VectorDB
+from .services.query_log import get_query_log
 
 # --- NOVA LÓGICA DE INICIALIZAÇÃO ---
 async def startup_sync():
     """
     Função que roda em segundo plano quando o servidor liga.
     Ela recria a memória automaticamente.
+    
+    Com vários workers, só o primeiro que pegar o lock sincroniza; os demais
+    passam a usar a nova geração do índice assim que ela é publicada.
     """
     print("Auto-Sync: Iniciando sincronização automática com Google Drive...")
     try:
         settings = get_settings()
-        # Verificação de segurança simples
-        if settings.GOOGLE_DRIVE_FOLDER_ID and settings.GOOGLE_API_KEY:
+        # Verificação de segurança simples. O Drive usa a service account; a
+        # GOOGLE_API_KEY só é necessária para os embeddings do Gemini.
+        needs_api_key = settings.EMBEDDING_PROVIDER.lower() == "google"
+        if settings.GOOGLE_DRIVE_FOLDER_ID and (settings.GOOGLE_API_KEY or not needs_api_key):
+            from .services import VectorDB
+
             # Instancia o VectorDB
             vector_db = VectorDB(settings)
             
             # Executa a recriação do índice (em uma thread separada para não travar o boot)
-            await asyncio.to_thread(vector_db.refresh_knowledge_base)
-            print("Auto-Sync: Memória recriada com sucesso! O Chat está pronto.")
+            result = await asyncio.to_thread(
+                vector_db.refresh_knowledge_base,
+                settings.SYNC_MIN_INTERVAL_SECONDS
+            )
+            if result["status"] == "success":
+                print("Auto-Sync: Memória recriada com sucesso! O Chat está pronto.")
+            else:
+                print(f"Auto-Sync: {result['message']}")
         else:
             print("Auto-Sync: Configurações do Drive incompletas. Pulando sincronização.")
     except Exception as e:
         print(f"Auto-Sync Falhou: {str(e)}")
 
+async def startup_warm_up():
+    """
+    Importa em segundo plano os clientes de LLM e embeddings, para que o custo
+    não caia na primeira pergunta. Roda em cada worker.
+    """
+    try:
+        from .services.providers import warm_up_providers
+
+        start = time.perf_counter()
+        await asyncio.to_thread(warm_up_providers, get_settings())
+        print(f"Warm-up: provedores de LLM e embeddings prontos em {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"Warm-up Falhou: {str(e)}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # --- ANTES DO SERVIDOR INICIAR ---
     # Dispara a sincronização em background (fire and forget)
     # Isso garante que o servidor suba rápido, e a memória chega uns segundos depois.
     asyncio.create_task(startup_sync())
+    asyncio.create_task(startup_warm_up())
     
     yield
     
     # --- QUANDO O SERVIDOR DESLIGA ---
     print("Servidor desligando...")
+    # Grava no disco as perguntas que ainda estão na fila do log
+    query_log = get_query_log(get_settings())
+    if query_log is not None:
+        query_log.close()
 
 # ------------------------------------
 
@@ -12,10 +12,34 @@ class Settings(BaseSettings):
     
     GOOGLE_API_KEY: str = ""
     
+    LLM_PROVIDER: str = "google" # "google" ou "ollama" (modelo local)
     LLM_MODEL: str = "gemini-2.5-flash"
     LLM_TEMPERATURE: float = 0.3
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    
+    EMBEDDING_PROVIDER: str = "google" # "google" ou "local" (CPU/ONNX via fastembed)
+    EMBEDDING_MODEL: str = "" # Vazio = modelo padrão do provedor
     
     FAISS_INDEX_PATH: str = "faiss_index"
+    CHUNKING_STRATEGY: str = "structure" # "structure" (por artigo do estatuto) ou "recursive" (janela fixa)
+    CHUNK_MAX_CHARS: int = 1500 # Artigos maiores são quebrados nos parágrafos (§)
+    CHUNK_SIZE: int = 1000 # Janela fixa usada por "recursive" e por PDFs sem artigos
+    CHUNK_OVERLAP: int = 200
+    RETRIEVAL_K: int = 3
+    RETRIEVAL_SCORE_THRESHOLD: float = 0.3
+    CITATION_SNIPPET_CHARS: int = 200 # Tamanho do trecho devolvido em cada citação
+    
+    SYNC_MIN_INTERVAL_SECONDS: int = 600 # Workers que sobem depois não refazem um sync recente
+    
+    CACHE_ENABLED: bool = True
+    CACHE_PATH: str = "cache/shared_cache.sqlite3" # Cache de embeddings/respostas compartilhado entre workers
+    CACHE_TTL_SECONDS: int = 86400
+    
+    QUERY_LOG_ENABLED: bool = True
+    QUERY_LOG_PATH: str = "logs/query_log.sqlite3" # Log de perguntas para `python -m src.analytics`
+    
+    BATCH_MAX_QUESTIONS: int = 500 # Limite de perguntas por chamada em /chat/batch
+    BATCH_MAX_CONCURRENCY: int = 4 # Chamadas simultâneas ao LLM durante um batch
     
     GOOGLE_DRIVE_FOLDER_ID: str = "" # ID da pasta (fica na URL do navegador)
     GOOGLE_CREDENTIALS_PATH: str = "credentials/service_account.json"
@@ -0,0 +1,136 @@
+"""
+Relatório de tempo de import do processo da API.
+
+Uso:
+    python -m src.profile_startup [--module src.api] [--top 25] [--first-request]
+
+Importa o módulo num processo novo com `python -X importtime`, agrupa o tempo
+acumulado por pacote de primeiro nível e confere se dependências exclusivas da
+ingestão (PyMuPDF, cliente do Google Drive) ficaram fora do boot.
+
+Com --first-request, mede também o trabalho local da primeira requisição
+(montar VectorDB + ITTGraph, como as dependências do FastAPI fazem), sem
+chamadas de rede, com e sem o aquecimento feito no lifespan da API.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Módulos que só a ingestão (sync com o Drive / criação do índice) deve carregar.
+# langchain_text_splitters não entra: langgraph.graph.message importa
+# langchain_core.messages.utils, que o carrega por conta própria (import opcional).
+INGESTION_ONLY = ("fitz", "pymupdf", "googleapiclient")
+
+
+def run_importtime(module: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    """Importa `module` num subprocesso e retorna (tempo total em s, linhas do importtime)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(self_us), int(cumulative_us), name.strip()))
+    return elapsed, entries
+
+
+# Roda num processo novo; não faz chamadas de rede (só constrói os objetos)
+FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+import {module}
+from src.dependencies import get_settings, get_vector_db, get_graph
+settings = get_settings()
+if {warm_up}:
+    from src.services.providers import warm_up_providers
+    warm_up_providers(settings)
+before = set(sys.modules)
+start = time.perf_counter()
+get_graph(settings, get_vector_db(settings))
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def run_first_request(module: str, warm_up: bool) -> dict:
+    """Tempo (ms) e módulos novos da montagem do grafo da primeira requisição."""
+    # O cliente do Gemini exige uma chave para ser construído, mas nada é chamado
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY") or "profile-startup"}
+    proc = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", FIRST_REQUEST_SCRIPT.format(module=module, warm_up=warm_up)],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao medir a primeira requisição:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def by_package(entries: List[Tuple[int, int, str]]) -> Dict[str, int]:
+    """Soma o tempo próprio (us) de cada módulo no seu pacote de primeiro nível."""
+    totals: Dict[str, int] = defaultdict(int)
+    for self_us, _, name in entries:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Perfil de tempo de import do boot da API")
+    parser.add_argument("--module", default="src.api", help="Módulo a importar")
+    parser.add_argument("--top", type=int, default=25, help="Quantidade de pacotes listados")
+    parser.add_argument("--first-request", action="store_true",
+                        help="Mede também a montagem do grafo na primeira requisição")
+    args = parser.parse_args()
+
+    elapsed, entries = run_importtime(args.module)
+    totals = by_package(entries)
+    import_us = sum(totals.values())
+
+    print(f"Import de {args.module}: {elapsed * 1000:.0f} ms de processo, "
+          f"{import_us / 1000:.0f} ms em imports ({len(entries)} módulos)\n")
+
+    print(f"{'pacote':32s} {'ms':>9s} {'%':>6s}")
+    for package, us in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:32s} {us / 1000:9.1f} {100 * us / import_us:6.1f}")
+
+    loaded = {name for _, _, name in entries}
+    leaked = sorted(
+        name for name in loaded
+        if name.split(".")[0] in INGESTION_ONLY
+    )
+    print()
+    if leaked:
+        print("ATENÇÃO: módulos de ingestão carregados no boot:")
+        for name in leaked:
+            print(f"  {name}")
+    else:
+        print("OK: nenhum módulo exclusivo da ingestão foi carregado no boot.")
+
+    if args.first_request:
+        print("\nPrimeira requisição (VectorDB + ITTGraph, sem rede):")
+        for warm_up in (False, True):
+            result = run_first_request(args.module, warm_up)
+            label = "com aquecimento" if warm_up else "sem aquecimento"
+            line = f"  {label:16s} {result['ms']:9.1f} ms, {len(result['modules'])} módulos novos"
+            packages = sorted({name.split(".")[0] for name in result["modules"]} & set(INGESTION_ONLY))
+            if packages:
+                line += f" (inclui {', '.join(packages)})"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
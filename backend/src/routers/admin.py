@@ -16,11 +16,17 @@ async def sync_knowledge_base(
     """
     try:
         result = vector_db.refresh_knowledge_base()
-        return result
     except Exception as e:
         # Logar o erro real aqui seria bom
         print(f"Erro na sincronização: {e}") 
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Falha ao atualizar base de conhecimento: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+    if result["status"] == "busy":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=result["message"]
+        )
+    return result
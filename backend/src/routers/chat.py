@@ -1,17 +1,23 @@
 """
 Chat router for handling conversational endpoints.
 """
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
 import logging
+import os
 
 from ..schemas import (
     QueryRequest,
     QueryResponse,
+    BatchQueryRequest,
+    BatchQueryItem,
+    ChunkResponse,
     ErrorResponse
 )
-from ..services import ITTGraph
-from ..dependencies import get_graph
+from ..services import ITTGraph, VectorDB
+from ..config import Settings
+from ..dependencies import get_graph, get_settings, get_vector_db
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +59,7 @@ async def query_response(
     try:
         logger.info(f"Processing query from user: {request.user_id}")
         
-        result = graph.invoke(request.message)
+        result = graph.invoke(request.message, user_id=request.user_id)
         
         response = QueryResponse(
             response=result["response"],
@@ -68,4 +74,144 @@ async def query_response(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing query: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    summary="Process a batch of user queries",
+    description=(
+        "Process many queries at once and stream the answers back as NDJSON, "
+        "one BatchQueryItem per line, in completion order"
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "NDJSON stream of BatchQueryItem objects",
+            "content": {"application/x-ndjson": {}}
+        },
+        400: {
+            "description": "Bad request - invalid input",
+            "model": ErrorResponse
+        },
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse
+        }
+    }
+)
+async def batch_query_response(
+    request: BatchQueryRequest,
+    graph: ITTGraph = Depends(get_graph),
+    settings: Settings = Depends(get_settings)
+) -> StreamingResponse:
+
+    if len(request.messages) > settings.BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large: at most {settings.BATCH_MAX_QUESTIONS} messages per request"
+        )
+
+    logger.info(f"Processing batch of {len(request.messages)} queries from user: {request.user_id}")
+
+    # Embeddings e busca FAISS para todas as perguntas de uma vez
+    try:
+        related_docs = await asyncio.to_thread(graph.vector_db.query_batch, request.messages)
+    except Exception as e:
+        logger.error(f"Error retrieving documents for batch: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing batch: {str(e)}"
+        )
+
+    semaphore = asyncio.Semaphore(max(1, settings.BATCH_MAX_CONCURRENCY))
+
+    async def answer(index: int, message: str) -> BatchQueryItem:
+        async with semaphore:
+            try:
+                result = await asyncio.to_thread(
+                    graph.invoke, message, related_docs[index],
+                    user_id=request.user_id, origin="batch"
+                )
+                return BatchQueryItem(
+                    index=index,
+                    message=message,
+                    response=result["response"],
+                    source_documents=result["source_documents"]
+                )
+            except Exception as e:
+                logger.error(f"Error processing batch item {index}: {str(e)}", exc_info=True)
+                return BatchQueryItem(index=index, message=message, error=str(e))
+
+    async def stream_results():
+        tasks = [
+            asyncio.create_task(answer(index, message))
+            for index, message in enumerate(request.messages)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item = await finished
+                yield item.model_dump_json() + "\n"
+            logger.info(f"Batch processed successfully for user: {request.user_id}")
+        finally:
+            # Cliente desconectou no meio do stream: não gasta LLM à toa
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/chunks/{chunk_id}",
+    response_model=ChunkResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Fetch a source chunk",
+    description="Return the full text of a chunk cited in source_documents",
+    responses={
+        200: {
+            "description": "Successful response",
+            "model": ChunkResponse
+        },
+        404: {
+            "description": "Chunk not found",
+            "model": ErrorResponse
+        },
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse
+        }
+    }
+)
+async def get_chunk(
+    chunk_id: str,
+    response: Response,
+    vector_db: VectorDB = Depends(get_vector_db)
+) -> ChunkResponse:
+
+    try:
+        doc = await asyncio.to_thread(vector_db.get_chunk, chunk_id)
+    except Exception as e:
+        logger.error(f"Error fetching chunk {chunk_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching chunk: {str(e)}"
+        )
+
+    if doc is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Chunk not found: {chunk_id}"
+        )
+
+    # O id é derivado do conteúdo, então o mesmo id sempre devolve o mesmo texto
+    response.headers["Cache-Control"] = "public, max-age=86400, immutable"
+    response.headers["ETag"] = f'"{chunk_id}"'
+
+    page = doc.metadata.get("page")
+    source = doc.metadata.get("source")
+    return ChunkResponse(
+        chunk_id=chunk_id,
+        source=os.path.basename(source) if source else None,
+        page=page + 1 if isinstance(page, int) else None,
+        content=doc.page_content
+    )
@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation.
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
 
 class QueryRequest(BaseModel):
@@ -30,15 +30,28 @@ class QueryRequest(BaseModel):
 
 
 class SourceDocument(BaseModel):
-    """Model for source document information."""
-    content: str = Field(..., description="Document content")
+    """Compact citation for a retrieved chunk; full text via GET /chat/chunks/{chunk_id}."""
+    chunk_id: Optional[str] = Field(None, description="Chunk identifier for GET /chat/chunks/{chunk_id}")
+    source: Optional[str] = Field(None, description="Source file name")
     page: Optional[int] = Field(None, description="Page number if applicable")
+    chapter: Optional[str] = Field(None, description="Statute chapter of the chunk, if detected")
+    article: Optional[str] = Field(None, description="Statute article of the chunk, if detected")
+    score: Optional[float] = Field(None, description="Retrieval relevance score")
+    snippet: str = Field(..., description="Short excerpt of the chunk content")
+
+
+class ChunkResponse(BaseModel):
+    """Response model for chunk endpoint."""
+    chunk_id: str = Field(..., description="Chunk identifier")
+    source: Optional[str] = Field(None, description="Source file name")
+    page: Optional[int] = Field(None, description="Page number if applicable")
+    content: str = Field(..., description="Full chunk content")
 
 
 class QueryResponse(BaseModel):
     """Response model for query endpoint."""
     response: str = Field(..., description="AI-generated response")
-    source_documents: List[str] = Field(
+    source_documents: List[SourceDocument] = Field(
         default_factory=list,
         description="List of source documents used"
     )
@@ -47,10 +60,57 @@ class QueryResponse(BaseModel):
         json_schema_extra = {
             "example": {
                 "response": "Para solicitar um certificado...",
-                "source_documents": ["Documento 1 content...", "Documento 2 content..."]
+                "source_documents": [
+                    {
+                        "chunk_id": "3f2a9c0d1e4b5a67",
+                        "source": "estatuto_itt.pdf",
+                        "page": 4,
+                        "score": 0.71,
+                        "snippet": "Art. 12. O certificado será emitido..."
+                    }
+                ]
+            }
+        }
+
+
+class BatchQueryRequest(BaseModel):
+    """Request model for batch query endpoint."""
+    messages: List[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(
+        ...,
+        min_length=1,
+        description="List of user query messages",
+        example=["Como faço para solicitar um certificado?", "Quem pode ser associado do ITT?"]
+    )
+    user_id: Optional[str] = Field(
+        None,
+        description="Optional user identifier for tracking",
+        example="user_123"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "messages": [
+                    "Como faço para solicitar um certificado?",
+                    "Quem pode ser associado do ITT?"
+                ],
+                "user_id": "user_123"
             }
         }
 
+
+class BatchQueryItem(BaseModel):
+    """One NDJSON line streamed by the batch query endpoint."""
+    index: int = Field(..., description="Position of the question in the request")
+    message: str = Field(..., description="Original user query message")
+    response: Optional[str] = Field(None, description="AI-generated response")
+    source_documents: List[SourceDocument] = Field(
+        default_factory=list,
+        description="List of source documents used"
+    )
+    error: Optional[str] = Field(None, description="Error description if this question failed")
+
+
 class ErrorResponse(BaseModel):
     """Response model for errors."""
     detail: str = Field(..., description="Error description")
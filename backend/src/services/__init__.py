@@ -1,7 +1,22 @@
 """
 Services package for business logic.
+
+Exports are resolved lazily, so importing a lightweight submodule (e.g. the
+query log used by `python -m src.analytics`) does not pull in langchain,
+langgraph or FAISS.
 """
-from .vectorDB import VectorDB
-from .graph import ITTGraph
+import importlib
+
+_EXPORTS = {
+    "VectorDB": ".vectorDB",
+    "ITTGraph": ".graph",
+}
 
 __all__ = ["VectorDB", "ITTGraph"]
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,114 @@
+"""
+Cache local compartilhado entre workers (SQLite em disco).
+
+Guarda embeddings de perguntas e respostas já geradas, para que todos os
+processos do mesmo host aproveitem o trabalho uns dos outros.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from ..config import Settings
+
+
+class SharedCache:
+    """Cache chave/valor com TTL, seguro para várias threads e vários processos."""
+
+    def __init__(self, path: str, ttl_seconds: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_created_at ON cache (created_at)")
+        self.prune()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _hash(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        try:
+            row = self._connection().execute(
+                "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, self._hash(key))
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        if time.time() - row[1] > self.ttl_seconds:
+            self._delete(namespace, key)
+            return None
+        return row[0]
+
+    def _delete(self, namespace: str, key: str) -> None:
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (namespace, self._hash(key))
+                )
+        except sqlite3.Error:
+            pass
+
+    def prune(self) -> int:
+        """
+        Remove as entradas vencidas e retorna quantas foram apagadas.
+        Roda ao abrir o cache e a cada nova geração do índice, para o arquivo
+        não crescer sem limite com perguntas que nunca se repetem.
+        """
+        try:
+            with self._connection() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM cache WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                return cursor.rowcount
+        except sqlite3.Error:
+            return 0
+
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+                    (namespace, self._hash(key), value, time.time())
+                )
+        except sqlite3.Error:
+            # Cache é só otimização: falha de escrita (ex.: banco ocupado) não derruba a requisição
+            pass
+
+
+@lru_cache()
+def _open_cache(path: str, ttl_seconds: int) -> SharedCache:
+    return SharedCache(path, ttl_seconds)
+
+
+def get_shared_cache(settings: Settings) -> Optional[SharedCache]:
+    """Retorna o cache compartilhado do processo, ou None se estiver desabilitado."""
+    if not settings.CACHE_ENABLED:
+        return None
+    return _open_cache(settings.CACHE_PATH, settings.CACHE_TTL_SECONDS)
@@ -1,10 +1,10 @@
 from typing import Literal, List, Optional
 from langchain_core.pydantic_v1 import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+from langchain_core.runnables import RunnablePassthrough
 from ..config import Settings
+from .providers import get_chat_model
 
 TRIAGE_PROMPT = (
     "Você é um classificador de perguntas para um assistente de IA do Instituto Tadao Takahashi (ITT). "
@@ -36,11 +36,7 @@ def get_triage_chain(settings: Settings):
     Cria chain de triagem usando JsonOutputParser em vez de with_structured_output.
     Isso evita problemas de conversão de schema do Pydantic v1 para Gemini.
     """
-    llm = ChatGoogleGenerativeAI(
-        model=settings.LLM_MODEL,
-        temperature=settings.LLM_TEMPERATURE,
-        google_api_key=settings.GOOGLE_API_KEY
-    )
+    llm = get_chat_model(settings)
     
     # Usa JsonOutputParser para parsear a resposta JSON
     parser = JsonOutputParser(pydantic_object=TriageOutput)
@@ -83,6 +79,10 @@ def get_triage_chain(settings: Settings):
     
     return TriageChain()
 
+# Recusa que o prompt do RAG manda usar quando o contexto não responde a pergunta;
+# o grafo reconhece esta frase para registrar a resposta como "não sei"
+DONT_KNOW_ANSWER = "Com base no estatuto do ITT que tenho acesso, não encontrei uma resposta para sua pergunta."
+
 RAG_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system",
      "Você é um assistente especialista sobre o Instituto Tadao Takahashi (ITT). "
@@ -95,10 +95,14 @@ RAG_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
      "--- REGRAS DE EXECUÇÃO DA RESPOSTA ---\n\n"
      "2. **Sintetize a Informação:** Combine informações de diferentes partes do contexto para construir uma resposta coesa e completa. Não se limite a extrair trechos isolados.\n\n"
      "3. **Seja Direto e Formate Bem:** Responda diretamente à pergunta do usuário. Use listas (bullet points) para organizar informações complexas e facilitar a leitura.\n\n"
-     "4. **Quando não souber:** Se a resposta para uma pergunta específica (tipo 1a) não puder ser encontrada no contexto, responda de forma educada: 'Com base no estatuto do ITT que tenho acesso, não encontrei uma resposta para sua pergunta.'"),
+     "4. **Quando não souber:** Se a resposta para uma pergunta específica (tipo 1a) não puder ser encontrada no contexto, responda de forma educada: '" + DONT_KNOW_ANSWER + "'"),
     ("human", "Pergunta do Usuário: {input}\n\nContexto do Estatuto do ITT:\n{context}")
 ])
 
+def format_docs(docs) -> str:
+    """Junta o conteúdo dos documentos recuperados para o campo {context} do prompt."""
+    return "\n\n".join(doc.page_content for doc in docs)
+
 def get_rag_chain(settings: Settings):
     """
     Creates RAG chain for question answering.
@@ -106,15 +110,19 @@ def get_rag_chain(settings: Settings):
     1. Graph passes {"input": question, "context": docs} to chain
     2. ChatPromptTemplate formats the prompt with input/context
     3. LLM generates text response (NOT JSON, just plain text)
-    4. create_stuff_documents_chain combines docs and returns string
+    4. StrOutputParser returns the message content as a string
     5. Graph receives plain string response
+
+    Docs are joined here (same format as create_stuff_documents_chain) so that
+    langchain.chains, and langchain_text_splitters with it, stay out of the boot.
     """
-    llm = ChatGoogleGenerativeAI(
-        model=settings.LLM_MODEL,
-        temperature=settings.LLM_TEMPERATURE,
-        google_api_key=settings.GOOGLE_API_KEY
+    llm = get_chat_model(settings)
+    return (
+        RunnablePassthrough.assign(context=lambda inputs: format_docs(inputs["context"]))
+        | RAG_PROMPT_TEMPLATE
+        | llm
+        | StrOutputParser()
     )
-    return create_stuff_documents_chain(llm, RAG_PROMPT_TEMPLATE)
 
 
 # from typing import Literal, List
@@ -0,0 +1,229 @@
+"""
+Chunking que segue a estrutura do estatuto em vez de janelas fixas de caracteres.
+
+Recebe as páginas do PyMuPDFLoader (um Document por página) e monta um chunk por
+artigo ("Art. 12 ..."), com os parágrafos (§) e incisos dentro dele. Cada chunk
+leva nos metadados a hierarquia em que está (statute_title/statute_chapter/
+statute_section/statute_article) e a página onde começa, o que permite filtrar a
+busca por capítulo ou artigo. O prefixo evita sobrescrever metadados do próprio
+PDF (o PyMuPDFLoader já grava "title").
+
+Só contam como estrutura linhas que têm a forma de um cabeçalho: "Art." com
+maiúscula seguido do número e do ordinal, e TÍTULO/CAPÍTULO/SEÇÃO em linhas
+curtas todas em maiúsculas. Remissões quebradas em linha ("... previsto no
+art. 1º deste Estatuto", "Seção II deste Capítulo, ...") continuam sendo texto.
+
+Artigos maiores que `max_chars` são quebrados nas fronteiras de parágrafo (§).
+PDFs sem artigos reconhecíveis caem no RecursiveCharacterTextSplitter de antes.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+TITLE_RE = re.compile(r"^\s*T[ÍI]TULO\s+([IVXLCDM]+|\d+)\b")
+CHAPTER_RE = re.compile(r"^\s*CAP[ÍI]TULO\s+([IVXLCDM]+|\d+)\b")
+SECTION_RE = re.compile(r"^\s*SE[ÇC][ÃA]O\s+([IVXLCDM]+|\d+)\b")
+# "Art. 1º", "Art. 2o -", "Art. 10." ou "Art. 10 " no início da linha
+ARTICLE_RE = re.compile(r"^\s*(?:Art\.|Artigo)\s*(\d+)\s*(?:[º°]|o\b|\.)?(?=\s|[-–—]|$)")
+PARAGRAPH_RE = re.compile(r"^\s*(§\s*\d+\s*[º°o]?|Parágrafo\s+único)")
+
+# Cabeçalhos de verdade são curtos e em maiúsculas ("CAPÍTULO II - DOS ASSOCIADOS")
+HEADING_MAX_CHARS = 80
+
+# Nível hierárquico de cada cabeçalho; um cabeçalho zera os níveis abaixo dele
+HEADINGS = (
+    ("title", TITLE_RE),
+    ("chapter", CHAPTER_RE),
+    ("section", SECTION_RE),
+)
+LEVELS = ("title", "chapter", "section", "article")
+METADATA_PREFIX = "statute_"
+
+Line = Tuple[str, int]  # (texto, página)
+
+
+def _is_caps_line(line: str) -> bool:
+    line = line.strip()
+    return bool(line) and len(line) <= HEADING_MAX_CHARS and line.isupper()
+
+
+def _heading_level(line: str) -> Optional[str]:
+    if not _is_caps_line(line):
+        return None
+    for level, pattern in HEADINGS:
+        if pattern.match(line):
+            return level
+    return None
+
+
+def _heading_name(lines: List[Line], i: int) -> Tuple[str, int]:
+    """
+    Nome completo de um cabeçalho e quantas linhas ele ocupa. No estatuto a
+    denominação costuma vir nas linhas seguintes, em maiúsculas
+    ("CAPÍTULO II" / "DOS ASSOCIADOS E" / "DE SEUS DIREITOS").
+    """
+    parts = [lines[i][0].strip()]
+    j = i + 1
+    while (
+        j < len(lines)
+        and _is_caps_line(lines[j][0])
+        and not _heading_level(lines[j][0])
+        and not ARTICLE_RE.match(lines[j][0])
+    ):
+        parts.append(lines[j][0].strip())
+        j += 1
+    name = parts[0]
+    if len(parts) > 1:
+        name = f"{name} - {' '.join(parts[1:])}"
+    return name, j - i
+
+
+class StatuteChunker:
+    def __init__(self, max_chars: int = 1500, fallback_chunk_size: int = 1000, fallback_overlap: int = 200):
+        self.max_chars = max_chars
+        self.fallback_chunk_size = fallback_chunk_size
+        self.fallback_overlap = fallback_overlap
+        self.fallback = RecursiveCharacterTextSplitter(
+            chunk_size=fallback_chunk_size,
+            chunk_overlap=fallback_overlap,
+            separators=["\n\n", "\n", " ", ""]
+        )
+
+    def split_documents(self, pages: Iterable[Document]) -> List[Document]:
+        """Divide as páginas de cada arquivo, mantendo a ordem dos arquivos."""
+        by_source: Dict[str, List[Document]] = {}
+        for page in pages:
+            by_source.setdefault(str(page.metadata.get("source", "")), []).append(page)
+
+        chunks = []
+        for source_pages in by_source.values():
+            chunks.extend(self._split_source(source_pages))
+        return chunks
+
+    def _split_source(self, pages: List[Document]) -> List[Document]:
+        lines: List[Line] = []
+        for page in pages:
+            page_number = page.metadata.get("page")
+            lines.extend((line, page_number) for line in page.page_content.splitlines() if line.strip())
+
+        if not any(ARTICLE_RE.match(line) for line, _ in lines):
+            return self.fallback.split_documents(pages)
+
+        base_metadata = {
+            key: value for key, value in pages[0].metadata.items()
+            if key not in ("page", "page_end")
+        }
+        hierarchy: Dict[str, Optional[str]] = {level: None for level in LEVELS}
+        chunks: List[Document] = []
+        current: List[Line] = []
+        # Linhas de cabeçalho ainda sem artigo; entram no texto do próximo chunk
+        headings: List[Line] = []
+        new_levels = set()
+
+        def flush():
+            if current:
+                chunks.extend(self._build_chunks(current, hierarchy, base_metadata, new_levels))
+                current.clear()
+                new_levels.clear()
+
+        i = 0
+        while i < len(lines):
+            line, _ = lines[i]
+            level = _heading_level(line)
+            if level:
+                flush()
+                hierarchy[level], size = _heading_name(lines, i)
+                for lower in LEVELS[LEVELS.index(level) + 1:]:
+                    hierarchy[lower] = None
+                headings.extend(lines[i:i + size])
+                new_levels.add(level)
+                i += size
+                continue
+
+            article = ARTICLE_RE.match(line)
+            if article:
+                flush()
+                hierarchy["article"] = f"Art. {article.group(1)}"
+            if headings:
+                current.extend(headings)
+                headings.clear()
+            current.append(lines[i])
+            i += 1
+
+        # Cabeçalhos no fim do arquivo, sem artigo depois
+        current.extend(headings)
+        flush()
+        return chunks
+
+    def _build_chunks(self, lines: List[Line], hierarchy: Dict[str, Optional[str]], base_metadata: dict,
+                      new_levels: Iterable[str] = ()) -> List[Document]:
+        """
+        Um chunk por artigo, ou vários se ele passar de max_chars.
+        `new_levels` são os cabeçalhos que abrem este artigo; suas linhas já
+        estão no texto do primeiro chunk e não são repetidas no contexto.
+        """
+        # Contexto do artigo (capítulo/seção) no começo do texto, para o chunk
+        # fazer sentido sozinho tanto na busca quanto no prompt
+        def context(first: bool) -> str:
+            return " > ".join(
+                hierarchy[level] for level in ("chapter", "section")
+                if hierarchy[level] and not (first and level in new_levels)
+            )
+
+        # Os pedaços seguintes levam o contexto completo e "Art. N (continuação)";
+        # esse prefixo, o maior possível, sai do orçamento de cada chunk
+        continuation = "\n".join(
+            part for part in (context(False), hierarchy["article"] and f"{hierarchy['article']} (continuação)")
+            if part
+        )
+        budget = max(self.max_chars - len(continuation) - 1, self.max_chars // 2)
+
+        metadata = {
+            **base_metadata,
+            **{METADATA_PREFIX + level: value for level, value in hierarchy.items() if value},
+        }
+        chunks = []
+        for group in self._group_by_paragraph(lines, budget):
+            body = "\n".join(line for line, _ in group)
+            # Um único parágrafo grande demais: recorta por caracteres
+            pieces = [body] if len(body) <= budget else self._split_text(body, budget)
+            for piece in pieces:
+                prefix = continuation if chunks else context(True)
+                chunks.append(Document(
+                    page_content=f"{prefix}\n{piece}" if prefix else piece,
+                    metadata={**metadata, "page": group[0][1], "page_end": group[-1][1]}
+                ))
+        return chunks
+
+    def _split_text(self, text: str, size: int) -> List[str]:
+        """Janela fixa para um parágrafo que sozinho passa do orçamento do chunk."""
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=min(self.fallback_chunk_size, size),
+            chunk_overlap=min(self.fallback_overlap, size // 4),
+            separators=["\n\n", "\n", " ", ""]
+        )
+        return splitter.split_text(text)
+
+    def _group_by_paragraph(self, lines: List[Line], budget: int) -> List[List[Line]]:
+        """Agrupa parágrafos (§) consecutivos enquanto o texto couber em `budget` caracteres."""
+        paragraphs: List[List[Line]] = []
+        for line in lines:
+            if not paragraphs or PARAGRAPH_RE.match(line[0]):
+                paragraphs.append([line])
+            else:
+                paragraphs[-1].append(line)
+
+        groups: List[List[Line]] = []
+        size = 0
+        for paragraph in paragraphs:
+            paragraph_size = sum(len(text) + 1 for text, _ in paragraph)
+            # size conta um "\n" por linha; o texto do grupo tem um a menos
+            if groups and size + paragraph_size - 1 <= budget:
+                groups[-1].extend(paragraph)
+                size += paragraph_size
+            else:
+                groups.append(list(paragraph))
+                size = paragraph_size
+        return groups
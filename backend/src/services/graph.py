@@ -1,50 +1,107 @@
+import json
+import os
+import time
 from typing import TypedDict, Optional, List
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.documents import Document
 
-from .chains import get_triage_chain, get_rag_chain, TRIAGE_PROMPT
+from .chains import get_triage_chain, get_rag_chain, TRIAGE_PROMPT, DONT_KNOW_ANSWER
 from .vectorDB import VectorDB
+from .cache import get_shared_cache
+from .query_log import get_query_log, normalize_question
 from ..config import Settings
 
+# Sem pontuação final: o modelo às vezes completa a frase ("... para sua pergunta sobre X.")
+_DONT_KNOW_PREFIX = normalize_question(DONT_KNOW_ANSWER).rstrip(".")
+
+
+def is_dont_know(text: str) -> bool:
+    """Reconhece a recusa do RAG (frase do prompt) ou um "Não sei" seco."""
+    normalized = normalize_question(text).strip("\"'*_ ")
+    return normalized.rstrip(".!?") == "não sei" or normalized.startswith(_DONT_KNOW_PREFIX)
+
 class AgentState(TypedDict, total=False):
     question: str
+    related_docs: Optional[List[Document]]
     triage: dict
     answer: Optional[str]
     citations: List[dict]
     rag_success: bool
     final_action: str
+    retrieval_scores: List[float]
+    timings: dict
 
 class ITTGraph:
     def __init__(self, settings: Settings, vector_db: VectorDB):
         self.settings = settings
         self.vector_db = vector_db
+        self.cache = get_shared_cache(settings)
+        self.query_log = get_query_log(settings)
         self.triage_chain = get_triage_chain(settings)
         self.rag_chain = get_rag_chain(settings)
         self.graph = self._build_graph()
     
     def _node_triage(self, state: AgentState) -> AgentState:
         question = state["question"]
+        start = time.perf_counter()
         triage_result = self.triage_chain.invoke([
             SystemMessage(content=TRIAGE_PROMPT),
             HumanMessage(content=question)
         ])
-        return {"triage": triage_result.dict()}
+        timings = {**state.get("timings", {}), "triage_ms": (time.perf_counter() - start) * 1000}
+        return {"triage": triage_result.dict(), "timings": timings}
 
     def _node_auto_resolve(self, state: AgentState) -> AgentState:
         question = state["question"]
-        related_docs = self.vector_db.query(question)
+        timings = dict(state.get("timings", {}))
+
+        related_docs = state.get("related_docs")
+        if related_docs is None:
+            start = time.perf_counter()
+            related_docs = self.vector_db.query(question)
+            timings["retrieval_ms"] = (time.perf_counter() - start) * 1000
+        else:
+            # Busca feita antes, em lote: o tempo dela não pertence a esta pergunta
+            timings["retrieval_ms"] = None
+        scores = [doc.metadata["score"] for doc in related_docs if "score" in doc.metadata]
 
         if not related_docs:
-            return {"answer": "Não sei.", "citations": [], "rag_success": False}
+            return {"answer": "Não sei.", "citations": [], "rag_success": False,
+                    "retrieval_scores": scores, "timings": timings}
 
+        start = time.perf_counter()
         llm_response = self.rag_chain.invoke({"input": question, "context": related_docs})
+        timings["llm_ms"] = (time.perf_counter() - start) * 1000
         text = (llm_response or "").strip()
 
-        if text.rstrip(".!?") == "Não sei":
-            return {"answer": "Não sei.", "citations": [], "rag_success": False}
+        if is_dont_know(text):
+            # Sem citações: os documentos recuperados não responderam a pergunta
+            return {"answer": text, "citations": [], "rag_success": False,
+                    "retrieval_scores": scores, "timings": timings}
 
-        citations = [{"content": doc.page_content} for doc in related_docs]
-        return {"answer": text, "citations": citations, "rag_success": True}
+        citations = [self._to_citation(doc) for doc in related_docs]
+        return {"answer": text, "citations": citations, "rag_success": True,
+                "retrieval_scores": scores, "timings": timings}
+
+    def _to_citation(self, doc: Document) -> dict:
+        """Citação compacta: o texto completo fica disponível em GET /chat/chunks/{chunk_id}."""
+        metadata = doc.metadata
+        page = metadata.get("page")
+        snippet = " ".join(doc.page_content.split())
+        limit = self.settings.CITATION_SNIPPET_CHARS
+        if len(snippet) > limit:
+            snippet = snippet[:limit].rstrip() + "…"
+        return {
+            "chunk_id": metadata.get("chunk_id"),
+            "source": os.path.basename(metadata["source"]) if metadata.get("source") else None,
+            # PyMuPDF numera as páginas a partir de 0
+            "page": page + 1 if isinstance(page, int) else None,
+            "chapter": metadata.get("statute_chapter"),
+            "article": metadata.get("statute_article"),
+            "score": metadata.get("score"),
+            "snippet": snippet,
+        }
 
     def _node_request_info(self, state: AgentState) -> AgentState:
         missing_fields = state["triage"].get("campos_faltantes", [])
@@ -77,9 +134,80 @@ class ITTGraph:
 
         return workflow.compile()
     
-    def invoke(self, question: str) -> dict:
-        result = self.graph.invoke({"question": question})
-        return {
+    def _log(self, question: str, user_id: Optional[str], origin: str, generation: Optional[str],
+             result: Optional[AgentState], total_ms: float) -> None:
+        """Registra a pergunta no log (não bloqueia; `result` None indica cache hit)."""
+        if self.query_log is None:
+            return
+        entry = {
+            "user_id": user_id,
+            "origin": origin,
+            "question": question,
+            "question_normalized": normalize_question(question),
+            "generation": generation,
+            "cached": int(result is None),
+            "total_ms": total_ms,
+        }
+        if result is not None:
+            decision = result.get("triage", {}).get("decisao")
+            scores = result.get("retrieval_scores", [])
+            timings = result.get("timings", {})
+            entry.update({
+                "decision": decision,
+                "rag_success": int(bool(result.get("rag_success"))),
+                "dont_know": int(decision == "AUTO_RESOLVER" and not result.get("rag_success")),
+                "n_docs": len(scores),
+                "max_score": max(scores) if scores else None,
+                "scores": scores,
+                "triage_ms": timings.get("triage_ms"),
+                "retrieval_ms": timings.get("retrieval_ms"),
+                "llm_ms": timings.get("llm_ms"),
+            })
+        self.query_log.record(entry)
+
+    def invoke(
+        self,
+        question: str,
+        related_docs: Optional[List[Document]] = None,
+        user_id: Optional[str] = None,
+        origin: str = "query"
+    ) -> dict:
+        """
+        Executa o grafo para uma pergunta.
+        
+        Se `related_docs` for informado (ex.: busca em lote feita previamente),
+        o nó de auto-resolução usa esses documentos em vez de consultar o VectorDB.
+        `origin` ("query" ou "batch") separa tráfego interativo de execuções em lote no log.
+        Respostas ficam no cache compartilhado por geração do índice, e toda
+        pergunta é registrada no log de perguntas.
+        """
+        start = time.perf_counter()
+        generation = self.vector_db.current_generation()
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = (
+                f"{generation}:{self.settings.LLM_PROVIDER}:{self.settings.LLM_MODEL}:"
+                f"{normalize_question(question)}"
+            )
+            cached = self.cache.get("answer", cache_key)
+            if cached is not None:
+                self._log(question, user_id, origin, generation, None, (time.perf_counter() - start) * 1000)
+                return json.loads(cached)
+
+        state: AgentState = {"question": question}
+        if related_docs is not None:
+            state["related_docs"] = related_docs
+        result = self.graph.invoke(state)
+        response = {
             "response": result.get("answer", ""),
-            "source_documents": [doc["content"] for doc in result.get("citations", [])]
-        }
\ No newline at end of file
+            "source_documents": result.get("citations", [])
+        }
+
+        # Recusas não vão para o cache: cada repetição da pergunta continua
+        # aparecendo no log como "não sei" (lacuna na base de documentos)
+        dont_know = result.get("triage", {}).get("decisao") == "AUTO_RESOLVER" and not result.get("rag_success")
+        if cache_key is not None and not dont_know:
+            self.cache.set("answer", cache_key, json.dumps(response).encode("utf-8"))
+        self._log(question, user_id, origin, generation, result, (time.perf_counter() - start) * 1000)
+        return response
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Armazenamento do índice FAISS em gerações, compartilhado entre workers.
+
+Layout em disco (dentro de FAISS_INDEX_PATH):
+
+    CURRENT          -> nome da geração ativa (ex.: "gen-20260101T120000-123456789-k2j4x9ab")
+    gen-.../         -> index.faiss + index.pkl + index_meta.json de cada geração
+
+Só quem segura o IndexLock constrói uma geração nova; os demais workers apenas
+leem o ponteiro CURRENT e recarregam o índice quando ele muda. Um índice salvo
+no formato antigo (index.faiss direto em FAISS_INDEX_PATH) continua sendo lido.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CURRENT_POINTER = "CURRENT"
+GENERATION_PREFIX = "gen-"
+INDEX_METADATA = "index_meta.json"
+
+# Índices gravados antes de existir INDEX_METADATA foram todos feitos com este modelo
+LEGACY_EMBEDDING_MODEL_ID = "google:models/gemini-embedding-001"
+
+
+class IndexLock:
+    """
+    Lock de arquivo entre processos para a sincronização/construção do índice.
+
+    Não bloqueante: se outro worker já estiver sincronizando, `acquired` fica False.
+    """
+
+    def __init__(self, index_path: str):
+        self.path = f"{os.path.abspath(index_path)}.lock"
+        self.acquired = False
+        self._fh = None
+
+    def __enter__(self) -> "IndexLock":
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fh = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_NBLCK, 1)
+            self.acquired = True
+        except OSError:
+            self.acquired = False
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.acquired:
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        self._fh.close()
+        self.acquired = False
+
+
+def current_index_dir(index_path: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Retorna (geração, diretório) do índice ativo, ou (None, None) se não houver índice.
+    """
+    pointer = os.path.join(index_path, CURRENT_POINTER)
+    try:
+        with open(pointer, "r", encoding="utf-8") as f:
+            generation = f.read().strip()
+        if generation:
+            return generation, os.path.join(index_path, generation)
+    except FileNotFoundError:
+        pass
+
+    # Formato antigo: index.faiss salvo direto em FAISS_INDEX_PATH
+    legacy_file = os.path.join(index_path, "index.faiss")
+    if os.path.exists(legacy_file):
+        return f"legacy-{os.stat(legacy_file).st_mtime_ns}", index_path
+
+    return None, None
+
+
+def write_index_metadata(index_dir: str, metadata: dict) -> None:
+    """Grava os metadados da geração (ex.: modelo de embeddings) ao lado do índice."""
+    with open(os.path.join(index_dir, INDEX_METADATA), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+def read_index_metadata(index_dir: str) -> dict:
+    """Lê os metadados da geração; índices antigos recebem o modelo de embeddings legado."""
+    try:
+        with open(os.path.join(index_dir, INDEX_METADATA), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"embedding_model": LEGACY_EMBEDDING_MODEL_ID}
+
+
+def generation_age_seconds(index_path: str) -> Optional[float]:
+    """Idade da geração ativa em segundos, ou None se não houver índice."""
+    generation, index_dir = current_index_dir(index_path)
+    if generation is None:
+        return None
+    return time.time() - os.stat(index_dir).st_mtime
+
+
+def new_generation_dir(index_path: str) -> Tuple[str, str]:
+    """
+    Cria o diretório de uma nova geração (ainda não publicada) e retorna (nome, diretório).
+
+    O diretório é criado de forma exclusiva (mkdtemp), então duas reconstruções no
+    mesmo segundo nunca reaproveitam a pasta de uma geração que outros workers
+    podem estar lendo via mmap.
+    """
+    os.makedirs(index_path, exist_ok=True)
+    seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    # Data + nanossegundos no começo do nome mantém a ordem cronológica ao ordenar
+    stamp = f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(seconds))}-{nanoseconds:09d}"
+    index_dir = tempfile.mkdtemp(prefix=f"{GENERATION_PREFIX}{stamp}-", dir=index_path)
+    # mkdtemp cria com 0700; os demais workers precisam ler a geração
+    os.chmod(index_dir, 0o755)
+    return os.path.basename(index_dir), index_dir
+
+
+def publish_generation(index_path: str, generation: str, keep: int = 2) -> None:
+    """
+    Aponta CURRENT para `generation` de forma atômica e remove gerações antigas.
+
+    As `keep` gerações mais recentes são mantidas para que workers que ainda
+    estejam carregando a anterior não percam os arquivos no meio da leitura.
+    """
+    active, _ = current_index_dir(index_path)
+    if generation == active:
+        # Reescrever a geração ativa truncaria arquivos que outros workers mapearam em memória
+        raise RuntimeError(f"A geração {generation} já é a ativa; publique um diretório novo")
+
+    pointer = os.path.join(index_path, CURRENT_POINTER)
+    tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp_pointer, "w", encoding="utf-8") as f:
+        f.write(generation)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, pointer)
+
+    generations = sorted(
+        name for name in os.listdir(index_path)
+        if name.startswith(GENERATION_PREFIX) and name not in (generation, active)
+    )
+    if active and active.startswith(GENERATION_PREFIX):
+        # A geração anterior é sempre uma das mantidas
+        generations.append(active)
+    for name in generations[:max(0, len(generations) - (keep - 1))]:
+        shutil.rmtree(os.path.join(index_path, name), ignore_errors=True)
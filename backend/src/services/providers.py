@@ -0,0 +1,122 @@
+"""
+Provedores de embeddings e de LLM, escolhidos pelo Settings.
+
+- EMBEDDING_PROVIDER="google": Gemini embeddings (chamada de rede por pergunta)
+- EMBEDDING_PROVIDER="local": modelo sentence-transformers pequeno rodando em
+  CPU via ONNX (fastembed), sem rede; requer o extra `uv sync --extra local`
+- LLM_PROVIDER="google": ChatGoogleGenerativeAI
+- LLM_PROVIDER="ollama": modelo servido localmente pelo Ollama (OLLAMA_BASE_URL)
+
+As bibliotecas de cada provedor são importadas só quando ele é usado.
+"""
+from functools import lru_cache
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from ..config import Settings
+
+DEFAULT_EMBEDDING_MODELS = {
+    "google": "models/gemini-embedding-001",
+    "local": "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+}
+
+
+class EmbeddingProvider:
+    """Embeddings usados pelo FAISS mais a forma certa de embutir perguntas."""
+
+    def __init__(self, provider: str, model: str, embeddings: Embeddings):
+        self.provider = provider
+        self.model = model
+        self.embeddings = embeddings
+
+    @property
+    def model_id(self) -> str:
+        """Identifica o modelo gravado nos metadados do índice, ex.: "google:models/gemini-embedding-001"."""
+        return f"{self.provider}:{self.model}"
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+
+class GoogleEmbeddingProvider(EmbeddingProvider):
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        # Uma única chamada em lote, com o task type de pergunta (não de documento)
+        return self.embeddings.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+
+
+class LocalEmbeddings(Embeddings):
+    """Embeddings em CPU via fastembed (ONNX Runtime), rodando no próprio processo."""
+
+    def __init__(self, model: str):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_PROVIDER=local requer o pacote fastembed: uv sync --extra local"
+            ) from e
+        self.model = TextEmbedding(model_name=model)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [vector.tolist() for vector in self.model.embed(texts)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return [vector.tolist() for vector in self.model.query_embed(texts)]
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_queries(texts)
+
+
+@lru_cache()
+def _load_embedding_provider(provider: str, model: str, api_key: str) -> EmbeddingProvider:
+    if provider == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        return GoogleEmbeddingProvider(
+            provider, model, GoogleGenerativeAIEmbeddings(model=model, google_api_key=api_key)
+        )
+    if provider == "local":
+        return LocalEmbeddingProvider(provider, model, LocalEmbeddings(model))
+    raise ValueError(f"EMBEDDING_PROVIDER inválido: {provider!r} (use 'google' ou 'local')")
+
+
+def get_embedding_provider(settings: Settings) -> EmbeddingProvider:
+    """Provedor de embeddings do processo; o modelo é carregado uma única vez."""
+    provider = settings.EMBEDDING_PROVIDER.lower()
+    model = settings.EMBEDDING_MODEL or DEFAULT_EMBEDDING_MODELS.get(provider, "")
+    return _load_embedding_provider(provider, model, settings.GOOGLE_API_KEY)
+
+
+def warm_up_providers(settings: Settings) -> None:
+    """
+    Cria uma vez os clientes configurados, para importar as bibliotecas deles
+    fora da primeira requisição. Com LLM_PROVIDER=google, o ChatGoogleGenerativeAI
+    importa google.generativeai e, por ele, googleapiclient (~2 s); com
+    EMBEDDING_PROVIDER=local, carrega o modelo ONNX.
+    """
+    get_embedding_provider(settings)
+    get_chat_model(settings)
+
+
+def get_chat_model(settings: Settings):
+    """LLM de chat configurado em LLM_PROVIDER/LLM_MODEL."""
+    provider = settings.LLM_PROVIDER.lower()
+    if provider == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=settings.LLM_MODEL,
+            temperature=settings.LLM_TEMPERATURE,
+            google_api_key=settings.GOOGLE_API_KEY
+        )
+    if provider == "ollama":
+        from langchain_community.chat_models import ChatOllama
+        return ChatOllama(
+            model=settings.LLM_MODEL,
+            temperature=settings.LLM_TEMPERATURE,
+            base_url=settings.OLLAMA_BASE_URL
+        )
+    raise ValueError(f"LLM_PROVIDER inválido: {provider!r} (use 'google' ou 'ollama')")
@@ -0,0 +1,161 @@
+"""
+Log de perguntas append-only, gravado em SQLite por uma thread em segundo plano.
+
+`QueryLog.record` só coloca o registro numa fila em memória; a escrita em disco
+acontece em lotes, fora do caminho da requisição. Se a fila encher, o registro
+é descartado em vez de atrasar a resposta.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "ts",
+    "user_id",
+    "origin",
+    "question",
+    "question_normalized",
+    "generation",
+    "decision",
+    "rag_success",
+    "dont_know",
+    "cached",
+    "n_docs",
+    "max_score",
+    "scores",
+    "triage_ms",
+    "retrieval_ms",
+    "llm_ms",
+    "total_ms",
+)
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS query_log (
+    ts REAL NOT NULL,
+    user_id TEXT,
+    origin TEXT NOT NULL DEFAULT 'query',
+    question TEXT NOT NULL,
+    question_normalized TEXT NOT NULL,
+    generation TEXT,
+    decision TEXT,
+    rag_success INTEGER,
+    dont_know INTEGER,
+    cached INTEGER NOT NULL DEFAULT 0,
+    n_docs INTEGER,
+    max_score REAL,
+    scores TEXT,
+    triage_ms REAL,
+    retrieval_ms REAL,
+    llm_ms REAL,
+    total_ms REAL
+)
+"""
+
+
+def normalize_question(question: str) -> str:
+    """Forma usada para agrupar perguntas repetidas (minúsculas, espaços colapsados)."""
+    return " ".join(question.lower().split())
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Abre o banco do log, criando a tabela se ainda não existir."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(CREATE_TABLE)
+    # Bancos criados antes da coluna origin
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(query_log)")}
+    if "origin" not in columns:
+        conn.execute("ALTER TABLE query_log ADD COLUMN origin TEXT NOT NULL DEFAULT 'query'")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_query_log_ts ON query_log (ts)")
+    return conn
+
+
+class QueryLog:
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval_seconds: float = 2.0,
+        max_queue_size: int = 10000
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, entry: dict) -> None:
+        """Enfileira um registro sem bloquear; descarta se a fila estiver cheia."""
+        entry.setdefault("ts", time.time())
+        entry.setdefault("cached", 0)
+        entry.setdefault("origin", "query")
+        if isinstance(entry.get("scores"), list):
+            entry["scores"] = json.dumps(entry["scores"])
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            logger.warning("Query log queue full, dropping entry")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Grava o que ainda estiver na fila e encerra a thread de escrita."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        conn = connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            if batch:
+                self._write(conn, batch)
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list) -> None:
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        rows = [tuple(entry.get(column) for column in COLUMNS) for entry in batch]
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO query_log ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(rows)} query log entries: {e}")
+
+
+@lru_cache()
+def _open_query_log(path: str) -> QueryLog:
+    return QueryLog(path)
+
+
+def get_query_log(settings: Settings) -> Optional[QueryLog]:
+    """Retorna o log de perguntas do processo, ou None se estiver desabilitado."""
+    if not settings.QUERY_LOG_ENABLED:
+        return None
+    return _open_query_log(settings.QUERY_LOG_PATH)
@@ -1,38 +1,203 @@
 from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 from pathlib import Path
+from typing import List, Optional
+import hashlib
+import numpy as np
 import os
+import pickle
 import shutil
+import threading
 
 from ..config import Settings
-from .google_drive import DriveService 
+from .cache import get_shared_cache
+from .providers import get_embedding_provider
+from .index_store import (
+    IndexLock,
+    current_index_dir,
+    generation_age_seconds,
+    new_generation_dir,
+    publish_generation,
+    read_index_metadata,
+    write_index_metadata,
+)
+
+# Índice carregado neste processo, reaproveitado entre requisições até a geração mudar
+_loaded_index = {"key": None, "store": None}
+_loaded_index_lock = threading.Lock()
+
+
+def make_chunk_id(doc: Document) -> str:
+    """
+    Gera um id estável para um chunk a partir do arquivo, página e conteúdo.
+    O mesmo trecho mantém o mesmo id entre reindexações, o que permite cachear
+    GET /chat/chunks/{id} no navegador/CDN.
+    """
+    source = os.path.basename(str(doc.metadata.get("source", "")))
+    key = f"{source}:{doc.metadata.get('page', '')}:{doc.page_content}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _with_score(doc: Document, score: float, chunk_id: Optional[str] = None) -> Document:
+    """Cópia do documento com o score de relevância (e o id, se conhecido) nos metadados."""
+    metadata = {**doc.metadata, "score": score}
+    if chunk_id and "chunk_id" not in metadata:
+        metadata["chunk_id"] = chunk_id
+    return Document(page_content=doc.page_content, metadata=metadata)
+
+
+def _read_vectorstore(index_dir: str, embedder) -> FAISS:
+    """
+    Carrega um índice salvo por FAISS.save_local, mapeando os vetores em memória
+    (mmap, somente leitura) em vez de copiá-los: workers no mesmo host passam a
+    compartilhar o page cache do index.faiss. O docstore (index.pkl) continua
+    sendo uma cópia por processo.
+    
+    Se a versão do faiss não suportar mmap para este tipo de índice, cai no
+    FAISS.load_local normal.
+    """
+    import faiss
+
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    try:
+        index = faiss.read_index(os.path.join(index_dir, "index.faiss"), flags)
+    except Exception as e:
+        print(f"Aviso: mmap do índice indisponível ({e}); carregando cópia em memória.")
+        return FAISS.load_local(index_dir, embedder, allow_dangerous_deserialization=True)
+
+    # Mesmo formato que FAISS.save_local grava; o arquivo é gerado pelo próprio backend
+    with open(os.path.join(index_dir, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    return FAISS(
+        embedding_function=embedder,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
 
 
 class VectorDB: 
     def __init__(self, settings: Settings): 
         self.settings = settings
-        self.embedder = GoogleGenerativeAIEmbeddings(
-            model="models/gemini-embedding-001",
-            google_api_key=settings.GOOGLE_API_KEY
-        )
+        self.embedding_provider = get_embedding_provider(settings)
+        self.embedder = self.embedding_provider.embeddings
+
+        self.cache = get_shared_cache(settings)
 
-    def query(self, message : str):
+    def current_generation(self) -> Optional[str]:
+        """Geração do índice ativo (muda a cada reindexação), ou None se não houver índice."""
+        generation, _ = current_index_dir(self.settings.FAISS_INDEX_PATH)
+        return generation
 
-        if not os.path.exists(self.settings.FAISS_INDEX_PATH):
+    def _load_vectorstore(self) -> FAISS:
+        generation, index_dir = current_index_dir(self.settings.FAISS_INDEX_PATH)
+        if generation is None:
             raise ValueError("O índice FAISS não foi encontrado. Certifique-se de que o índice foi criado e salvo corretamente.")
         
-        vectorstore = FAISS.load_local(self.settings.FAISS_INDEX_PATH, self.embedder, allow_dangerous_deserialization=True)
+        key = (os.path.abspath(self.settings.FAISS_INDEX_PATH), generation)
+        with _loaded_index_lock:
+            if _loaded_index["key"] != key:
+                # Vetores de modelos diferentes não são comparáveis: recusa em vez de buscar lixo
+                index_model = read_index_metadata(index_dir).get("embedding_model")
+                if index_model != self.embedding_provider.model_id:
+                    raise ValueError(
+                        f"O índice FAISS ({generation}) foi criado com o modelo de embeddings "
+                        f"'{index_model}', mas o configurado é '{self.embedding_provider.model_id}'. "
+                        "Recrie o índice com o modelo atual."
+                    )
+                _loaded_index["store"] = _read_vectorstore(index_dir, self.embedder)
+                _loaded_index["key"] = key
+            return _loaded_index["store"]
+
+    def _embed_queries(self, messages: List[str]) -> np.ndarray:
+        """
+        Embeddings das perguntas, consultando antes o cache compartilhado.
+        As que faltam são calculadas numa única chamada ao provedor.
+        """
+        vectors: List[Optional[np.ndarray]] = [None] * len(messages)
+        model = self.embedding_provider.model_id
+
+        if self.cache is not None:
+            for i, message in enumerate(messages):
+                cached = self.cache.get("embedding", f"{model}:{message}")
+                if cached is not None:
+                    vectors[i] = np.frombuffer(cached, dtype=np.float32)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            embeddings = self.embedding_provider.embed_queries([messages[i] for i in missing])
+            for i, embedding in zip(missing, embeddings):
+                vectors[i] = np.asarray(embedding, dtype=np.float32)
+                if self.cache is not None:
+                    self.cache.set("embedding", f"{model}:{messages[i]}", vectors[i].tobytes())
+
+        return np.vstack(vectors)
+
+    def query(self, message : str, filter: Optional[dict] = None):
 
-        retriever = vectorstore.as_retriever(search_type="similarity_score_threshold", 
-                                        search_kwargs={"score_threshold": 0.3, "k":4})
+        return self.query_batch([message], filter)[0]
+
+    def query_batch(self, messages: List[str], filter: Optional[dict] = None) -> List[List[Document]]:
+        """
+        Busca documentos para várias perguntas de uma só vez.
+        
+        Todas as perguntas são embutidas numa única chamada de embeddings e a
+        busca no FAISS é feita como uma única consulta matricial. Os resultados
+        seguem a mesma ordem de `messages`.
         
-        docs = retriever.invoke(message)
+        `filter` restringe a busca por metadados do chunk, ex.:
+        {"statute_chapter": "CAPÍTULO II - DOS ASSOCIADOS"} ou {"statute_article": "Art. 12"}.
+        """
+        if not messages:
+            return []
+
+        vectorstore = self._load_vectorstore()
+
+        vectors = self._embed_queries(messages)
+
+        k = self.settings.RETRIEVAL_K
+        # Com filtro, busca mais candidatos para sobrar k depois de filtrar
+        fetch_k = min(k * 5 if filter else k, vectorstore.index.ntotal)
+        if fetch_k == 0:
+            return [[] for _ in messages]
+
+        distances, indices = vectorstore.index.search(vectors, fetch_k)
+        relevance_fn = vectorstore._select_relevance_score_fn()
+
+        results = []
+        for row_distances, row_indices in zip(distances, indices):
+            docs = []
+            for distance, idx in zip(row_distances, row_indices):
+                if idx == -1:
+                    continue
+                score = relevance_fn(float(distance))
+                if score < self.settings.RETRIEVAL_SCORE_THRESHOLD:
+                    continue
+                docstore_id = vectorstore.index_to_docstore_id[idx]
+                doc = vectorstore.docstore.search(docstore_id)
+                if not isinstance(doc, Document):
+                    continue
+                if filter and any(doc.metadata.get(key) != value for key, value in filter.items()):
+                    continue
+                docs.append(_with_score(doc, score, docstore_id))
+                if len(docs) == k:
+                    break
+            results.append(docs)
+
+        return results
 
-        return docs
+    def get_chunk(self, chunk_id: str) -> Optional[Document]:
+        """Retorna o chunk completo pelo id, ou None se ele não existir no índice."""
+        vectorstore = self._load_vectorstore()
+        doc = vectorstore.docstore.search(chunk_id)
+        return doc if isinstance(doc, Document) else None
         
     def create_faiss_index(self, parent_folder : str):
+        # Dependências só da ingestão: importadas aqui para não pesar no boot da API
+        from langchain_community.document_loaders import PyMuPDFLoader
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        from .chunking import StatuteChunker
 
         if not os.path.exists(parent_folder):
             raise ValueError(f"O diretório {parent_folder} não existe. Verifique o caminho e tente novamente.")
@@ -55,23 +220,73 @@ class VectorDB:
             print("Nenhum documento encontrado. O índice não será atualizado.")
             return
         
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        if self.settings.CHUNKING_STRATEGY == "structure":
+            # Um chunk por artigo do estatuto, com capítulo/seção/artigo nos metadados
+            splitter = StatuteChunker(
+                max_chars=self.settings.CHUNK_MAX_CHARS,
+                fallback_chunk_size=self.settings.CHUNK_SIZE,
+                fallback_overlap=self.settings.CHUNK_OVERLAP
+            )
+        else:
+            splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.settings.CHUNK_SIZE,
+                chunk_overlap=self.settings.CHUNK_OVERLAP,
+                separators=["\n\n", "\n", " ", ""]
+            )
 
         split_docs = splitter.split_documents(docs)
+        print(f"Total de chunks gerados: {len(split_docs)}")
+
+        # O id do chunk vira também o id no docstore, para busca direta em get_chunk.
+        # Chunks idênticos na mesma página geram o mesmo id e são indexados uma vez só.
+        unique_docs = {}
+        for doc in split_docs:
+            doc.metadata["chunk_id"] = make_chunk_id(doc)
+            unique_docs.setdefault(doc.metadata["chunk_id"], doc)
 
-        vectorstore = FAISS.from_documents(split_docs, self.embedder)
+        vectorstore = FAISS.from_documents(
+            list(unique_docs.values()), self.embedder, ids=list(unique_docs.keys())
+        )
 
-        vectorstore.save_local(self.settings.FAISS_INDEX_PATH)
+        # Salva numa geração nova e só então troca o ponteiro: workers que estão
+        # atendendo continuam com a geração anterior até o índice novo estar completo
+        generation, index_dir = new_generation_dir(self.settings.FAISS_INDEX_PATH)
+        vectorstore.save_local(index_dir)
+        write_index_metadata(index_dir, {
+            "embedding_model": self.embedding_provider.model_id,
+            "dimension": vectorstore.index.d,
+            "chunks": len(unique_docs),
+            "chunking": self.settings.CHUNKING_STRATEGY,
+        })
+        publish_generation(self.settings.FAISS_INDEX_PATH, generation)
+        print(f"Índice publicado na geração {generation}")
 
+        # Respostas da geração anterior não serão mais lidas; limpa o que já venceu
+        if self.cache is not None:
+            removed = self.cache.prune()
+            print(f"Cache: {removed} entradas vencidas removidas")
 
-    def refresh_knowledge_base(self):
+
+    def refresh_knowledge_base(self, min_interval_seconds: int = 0):
         """
         Método Mestre: Baixa do Drive e recria o índice.
+        
+        Só um worker por vez executa a sincronização (lock de arquivo). Se o
+        índice ativo tiver menos de `min_interval_seconds`, nada é feito.
         """
+        with IndexLock(self.settings.FAISS_INDEX_PATH) as lock:
+            if not lock.acquired:
+                return {"status": "busy", "message": "Outro worker já está sincronizando a base de conhecimento."}
+
+            age = generation_age_seconds(self.settings.FAISS_INDEX_PATH)
+            if min_interval_seconds and age is not None and age < min_interval_seconds:
+                return {"status": "skipped", "message": "Base de conhecimento já foi atualizada recentemente."}
+
+            return self._sync_from_drive()
+
+    def _sync_from_drive(self):
+        from .google_drive import DriveService
+
         # 1. Configurar caminhos
         # Vamos assumir que data/ fica na raiz do backend
         base_path = Path(os.getcwd()) 
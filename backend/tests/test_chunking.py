@@ -0,0 +1,149 @@
+from langchain_core.documents import Document
+
+from src.services.chunking import StatuteChunker
+
+SOURCE = "estatuto.pdf"
+
+
+def make_pages(*pages):
+    return [
+        Document(page_content=text, metadata={"source": SOURCE, "page": number, "title": "Estatuto do ITT"})
+        for number, text in enumerate(pages)
+    ]
+
+
+def chunk(*pages, **kwargs):
+    return StatuteChunker(**kwargs).split_documents(make_pages(*pages))
+
+
+def by_article(chunks):
+    articles = {}
+    for doc in chunks:
+        articles.setdefault(doc.metadata.get("statute_article"), []).append(doc)
+    return articles
+
+
+def test_cross_reference_lines_stay_inside_the_article():
+    chunks = chunk(
+        "CAPÍTULO I\n"
+        "DISPOSIÇÕES GERAIS\n"
+        "Art. 1º O Instituto Tadao Takahashi é uma associação civil sem fins lucrativos.\n"
+        "Art. 2º As finalidades previstas no\n"
+        "art. 1º deste Estatuto:\n"
+        "I - serão executadas diretamente;\n"
+        "Seção II deste Capítulo, o Instituto poderá firmar convênios.\n"
+        "Art. 3º O Instituto terá duração indeterminada."
+    )
+    articles = by_article(chunks)
+
+    assert sorted(articles) == ["Art. 1", "Art. 2", "Art. 3"]
+    (art2,) = articles["Art. 2"]
+    assert "art. 1º deste Estatuto:" in art2.page_content
+    assert "I - serão executadas diretamente;" in art2.page_content
+    assert "Seção II deste Capítulo, o Instituto poderá firmar convênios." in art2.page_content
+    assert "statute_section" not in art2.metadata
+    assert "deste Estatuto" not in articles["Art. 1"][0].page_content
+
+
+def test_multi_line_heading_names_and_keeps_heading_text():
+    chunks = chunk(
+        "TÍTULO I\n"
+        "DO INSTITUTO\n"
+        "CAPÍTULO II\n"
+        "DOS ASSOCIADOS E\n"
+        "DE SEUS DIREITOS\n"
+        "SEÇÃO I\n"
+        "DA ADMISSÃO\n"
+        "Art. 5º Podem ser associados pessoas físicas e jurídicas.\n"
+        "Art. 6º A admissão depende de aprovação da Diretoria."
+    )
+    art5, art6 = chunks
+
+    assert art5.metadata["statute_title"] == "TÍTULO I - DO INSTITUTO"
+    assert art5.metadata["statute_chapter"] == "CAPÍTULO II - DOS ASSOCIADOS E DE SEUS DIREITOS"
+    assert art5.metadata["statute_section"] == "SEÇÃO I - DA ADMISSÃO"
+    assert art5.metadata["statute_article"] == "Art. 5"
+    # Linhas de cabeçalho ficam no texto do primeiro artigo, sem repetição
+    for heading in ("TÍTULO I", "DOS ASSOCIADOS E", "DE SEUS DIREITOS", "DA ADMISSÃO"):
+        assert heading in art5.page_content
+    assert art5.page_content.count("CAPÍTULO II") == 1
+    # Artigos seguintes recebem o contexto como prefixo
+    assert art6.page_content.startswith(
+        "CAPÍTULO II - DOS ASSOCIADOS E DE SEUS DIREITOS > SEÇÃO I - DA ADMISSÃO\nArt. 6º"
+    )
+
+
+def test_pdf_metadata_is_not_overwritten():
+    (doc,) = chunk("TÍTULO I\nDO INSTITUTO\nArt. 1º O Instituto é uma associação.")
+
+    assert doc.metadata["title"] == "Estatuto do ITT"
+    assert doc.metadata["statute_title"] == "TÍTULO I - DO INSTITUTO"
+
+
+def test_page_break_inside_article():
+    chunks = chunk(
+        "Art. 1º O Instituto tem sede na cidade de Brasília.\n"
+        "Art. 2º São órgãos do Instituto:\n"
+        "I - a Assembleia Geral;",
+        "II - a Diretoria;\n"
+        "III - o Conselho Fiscal.\n"
+        "Art. 3º A Assembleia Geral reúne-se anualmente."
+    )
+    articles = by_article(chunks)
+
+    (art2,) = articles["Art. 2"]
+    assert "I - a Assembleia Geral;\nII - a Diretoria;" in art2.page_content
+    assert art2.metadata["page"] == 0
+    assert art2.metadata["page_end"] == 1
+    assert articles["Art. 3"][0].metadata["page"] == 1
+
+
+def test_oversized_article_is_split_at_paragraphs():
+    paragraph = "texto do parágrafo " * 10
+    chunks = chunk(
+        "CAPÍTULO III\n"
+        "DA DIRETORIA\n"
+        f"Art. 10. Compete à Diretoria {paragraph}\n"
+        f"§ 1º {paragraph}\n"
+        f"§ 2º {paragraph}\n"
+        f"§ 3º {paragraph}",
+        max_chars=450
+    )
+
+    assert len(chunks) > 1
+    assert all(doc.metadata["statute_article"] == "Art. 10" for doc in chunks)
+    assert all(len(doc.page_content) <= 450 for doc in chunks)
+    for doc in chunks[1:]:
+        assert doc.page_content.startswith("CAPÍTULO III - DA DIRETORIA\nArt. 10 (continuação)\n§")
+    text = "\n".join(doc.page_content for doc in chunks)
+    for marker in ("§ 1º", "§ 2º", "§ 3º"):
+        assert marker in text
+
+
+def test_paragraph_groups_leave_room_for_the_context_prefix():
+    # § 2º + § 3º somam ~1480 caracteres: cabem em max_chars, mas não com o prefixo
+    paragraphs = "\n".join(f"§ {n}º " + "x" * 733 for n in range(1, 5))
+    chunks = chunk(f"CAPÍTULO III\nDA DIRETORIA\nArt. 10. Compete à Diretoria:\n{paragraphs}")
+
+    assert all(len(doc.page_content) <= 1500 for doc in chunks)
+    for doc in chunks[1:]:
+        assert doc.page_content.startswith("CAPÍTULO III - DA DIRETORIA\nArt. 10 (continuação)\n§")
+    assert any("§ 3º" in doc.page_content for doc in chunks[1:])
+
+
+def test_oversized_paragraph_pieces_keep_the_context_prefix():
+    chunks = chunk("CAPÍTULO III\nDA DIRETORIA\nArt. 10. Compete à Diretoria:\n§ 1º " + "palavra " * 500)
+
+    pieces = [doc for doc in chunks if "palavra" in doc.page_content]
+    assert len(pieces) > 2
+    assert all(len(doc.page_content) <= 1500 for doc in chunks)
+    for doc in pieces:
+        assert doc.page_content.startswith("CAPÍTULO III - DA DIRETORIA\nArt. 10 (continuação)\n")
+        assert doc.metadata["statute_article"] == "Art. 10"
+
+
+def test_pdf_without_articles_falls_back_to_fixed_window():
+    chunks = chunk("Relatório anual.\n" + "linha sem artigo " * 100, fallback_chunk_size=300, fallback_overlap=0)
+
+    assert len(chunks) > 1
+    assert all("statute_article" not in doc.metadata for doc in chunks)
@@ -0,0 +1,14 @@
+from src.services.chains import DONT_KNOW_ANSWER
+from src.services.graph import is_dont_know
+
+
+def test_prompt_refusal_counts_as_dont_know():
+    assert is_dont_know(DONT_KNOW_ANSWER)
+    assert is_dont_know(f'"{DONT_KNOW_ANSWER}"')
+    assert is_dont_know(DONT_KNOW_ANSWER.rstrip(".") + " sobre férias.")
+    assert is_dont_know("Não sei.")
+
+
+def test_regular_answer_is_not_dont_know():
+    assert not is_dont_know("O mandato da Diretoria é de dois anos.")
+    assert not is_dont_know("O ITT é uma associação civil. Não sei")
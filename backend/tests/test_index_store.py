@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from src.services.index_store import current_index_dir, new_generation_dir, publish_generation
+
+
+def test_new_generation_dirs_are_unique_and_ordered(tmp_path):
+    names = [new_generation_dir(str(tmp_path))[0] for _ in range(5)]
+
+    assert len(set(names)) == 5
+    assert names == sorted(names)
+    assert all(os.path.isdir(tmp_path / name) for name in names)
+
+
+def test_publish_refuses_the_active_generation(tmp_path):
+    generation, _ = new_generation_dir(str(tmp_path))
+    publish_generation(str(tmp_path), generation)
+
+    with pytest.raises(RuntimeError):
+        publish_generation(str(tmp_path), generation)
+    assert current_index_dir(str(tmp_path))[0] == generation
+
+
+def test_publish_keeps_the_previous_generation(tmp_path):
+    index_path = str(tmp_path)
+    first, _ = new_generation_dir(index_path)
+    publish_generation(index_path, first)
+    second, _ = new_generation_dir(index_path)
+    publish_generation(index_path, second)
+    third, _ = new_generation_dir(index_path)
+    publish_generation(index_path, third)
+
+    remaining = sorted(name for name in os.listdir(index_path) if name.startswith("gen-"))
+    assert remaining == [second, third]
+    assert current_index_dir(index_path)[0] == third